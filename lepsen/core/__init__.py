@@ -5,6 +5,7 @@ __all__ = [
 
     # lepsen.core.cmd
     "CmdPrefix",
+    "CmdRangeSet",
 
     # lepsen.core.features
     "OrderDependentFeatureDefinition",
@@ -12,13 +13,47 @@ __all__ = [
     "ConflictingFeatureValues",
     "NontrivialFeaturePath",
     "FeatureStorage",
+    "FeatureSnapshot",
 
     # lepsen.core.coerce_nbt
     "NbtCoerceable",
     "coerce_nbt_value",
+    "write_snbt",
+    "dump_snbt",
 
     # lepsen.core.markdown_iterator
     "markdown_iterator",
+
+    # lepsen.core.model_overrides
+    "ModelOverrideIssue",
+    "ModelOverrideAuditOptions",
+    "iter_model_overrides",
+    "audit_model_overrides",
+    "model_override_audit",
+    "merge_model_overrides",
+    "ItemModelOverrides",
+    "ModelOverrideGenerationOptions",
+    "model_override_generation",
+
+    # lepsen.core.incremental_output
+    "IncrementalOutputOptions",
+    "incremental_output",
+    "write_incremental",
+
+    # lepsen.core.periodic_jobs
+    "SCHEDULER_CYCLE",
+    "PeriodicJob",
+    "PeriodicJobs",
+    "PeriodicJobsOptions",
+    "balance_phases",
+    "periodic_jobs",
+
+    # lepsen.core.tree_shaking
+    "prune_unreachable",
+
+    # lepsen.core.inlining
+    "InlinedFunction",
+    "inline_functions",
 ]
 
 from .lepsen import *
@@ -26,6 +61,11 @@ from .cmd import *
 from .features import *
 from .coerce_nbt import *
 from .markdown_iterator import *
+from .model_overrides import *
+from .incremental_output import *
+from .periodic_jobs import *
+from .tree_shaking import *
+from .inlining import *
 
 from beet import Context
 def beet_default(ctx: Context):
@@ -1,13 +1,16 @@
 __all__ = [
     "CmdPrefix",
+    "CmdRangeSet",
 ]
 
 
 from typing import Optional, Union, Literal, overload
-from collections.abc import Sequence, Iterator
+from collections.abc import Sequence, Set, Iterable, Iterator
 from dataclasses import dataclass, field
 
+from bisect import bisect_right
 from functools import partial
+from itertools import accumulate
 from math import log2
 
 
@@ -118,6 +121,9 @@ class CmdPrefix(Sequence[int]):
                 return precision_range.index(value)
         raise RuntimeError("unreachable code")
 
+    def to_range_set(self, /) -> "CmdRangeSet":
+        return CmdRangeSet.from_prefix(self)
+
     @dataclass(frozen=True, slots=True, order=False)
     class Slice(Sequence[int]):
         target: "CmdPrefix"
@@ -187,6 +193,18 @@ class CmdPrefix(Sequence[int]):
         def count(self, value: int, /) -> Literal[0, 1]:
             return int(value in self)
 
+        def to_range_set(self, /) -> "CmdRangeSet":
+            return CmdRangeSet.from_slice(self)
+
+        def union(self, /, *others: "CmdRangeSetLike") -> "CmdRangeSet":
+            return self.to_range_set().union(*others)
+
+        def intersection(self, /, *others: "CmdRangeSetLike") -> "CmdRangeSet":
+            return self.to_range_set().intersection(*others)
+
+        def difference(self, /, *others: "CmdRangeSetLike") -> "CmdRangeSet":
+            return self.to_range_set().difference(*others)
+
         def index(self, value: int, /) -> int:
             if value not in self:
                 raise ValueError(f"{value} not in {self!r}")
@@ -392,3 +410,322 @@ class CmdPrefix(Sequence[int]):
                 f"start_index={self.start_index}, "
                 f"start_value={self.value_range[self.start_index]})"
             )
+
+
+def _representable_count(start: int, stop: int, /) -> int:
+    """Count the values in [start, stop) that survive float precision loss."""
+    count = 0
+    while start < stop:
+        precision_range = float_precision_range(start, stop)
+        count += len(precision_range)
+        start = precision_range.stop
+    return count
+
+
+def _representable_ranges(start: int, stop: int, /) -> Iterator[range]:
+    """Yield the values in [start, stop) that survive float precision loss."""
+    while start < stop:
+        precision_range = float_precision_range(start, stop)
+        if precision_range:
+            yield precision_range
+        start = precision_range.stop
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CmdRangeSet(Set[int]):
+    """
+    Lazy set of CustomModelData values, stored as sorted disjoint intervals.
+
+    Every interval implicitly contains only the values in it that survive float
+    precision loss, so set operations reduce to interval arithmetic and never
+    allocate individual values. Intervals are normalized so that equal sets have
+    equal intervals. `len` is O(1), membership is O(log n) in the number of
+    intervals, and iteration yields values in increasing order.
+
+    Other sets and iterables of ints can be used as operands. Values that are
+    not representable CustomModelData values are ignored where they cannot
+    affect the result (such as in intersections), and raise :class:`ValueError`
+    where the result would have to contain them (such as in unions).
+    """
+
+    intervals: tuple[tuple[int, int], ...]
+    cumulative_lengths: tuple[int, ...] = internal_field()
+    _hash: int = internal_field()
+
+    def __init__(self, /, intervals: Iterable[tuple[int, int]] = ()):
+        normalized: list[tuple[int, int]] = []
+        for start, stop in sorted(intervals):
+            # Snap both ends to representable values so that intervals which
+            # only differ in unrepresentable values compare equal.
+            representable = list(_representable_ranges(
+                max(start, 0),
+                min(stop, CMD_MAXIMUM),
+            ))
+            if not representable:
+                continue
+            start, stop = representable[0].start, representable[-1][-1] + 1
+            if normalized and (
+                start <= normalized[-1][1] or
+                _representable_count(normalized[-1][1], start) == 0
+            ):
+                previous_start, previous_stop = normalized.pop()
+                start, stop = previous_start, max(previous_stop, stop)
+            normalized.append((start, stop))
+        object.__setattr__(self, "intervals", tuple(normalized))
+        object.__setattr__(self, "cumulative_lengths", tuple(accumulate(
+            _representable_count(start, stop) for start, stop in normalized
+        )))
+
+    @classmethod
+    def from_prefix(
+        cls,
+        prefix: CmdPrefix,
+        /,
+        start: int = 0,
+        stop: int = CMD_MAXIMUM,
+    ) -> "CmdRangeSet":
+        """Return the values of a prefix in [start, stop) as a range set."""
+        block_size = 10_000
+        block_period = 10_000_000
+        first_block = prefix.prefix * block_size
+        skipped_blocks = max(0, (start - first_block) // block_period)
+        block_start = first_block + skipped_blocks * block_period
+        intervals = []
+        while block_start < min(stop, CMD_MAXIMUM):
+            intervals.append((
+                max(block_start, start),
+                min(block_start + block_size, stop),
+            ))
+            block_start += block_period
+        return cls(intervals)
+
+    @classmethod
+    def from_slice(cls, slice: CmdPrefix.Slice, /) -> "CmdRangeSet":
+        """Return the values of a contiguous slice as a range set."""
+        index_range = slice.index_range
+        if not index_range:
+            return cls()
+        elif abs(index_range.step) != 1:
+            raise ValueError(
+                f"Expected a slice with a step of 1 or -1, got {slice!r}",
+            )
+        start_index = min(index_range[0], index_range[-1])
+        stop_index = max(index_range[0], index_range[-1])
+        return cls.from_prefix(
+            slice.target,
+            slice.target[start_index],
+            slice.target[stop_index] + 1,
+        )
+
+    @classmethod
+    def _partition(
+        cls,
+        values: Iterable[object],
+        /,
+    ) -> tuple["CmdRangeSet", list[object]]:
+        """Split values into a range set and the values it cannot contain."""
+        intervals = []
+        unrepresentable = []
+        for value in values:
+            if (
+                isinstance(value, int) and
+                value in range(0, CMD_MAXIMUM) and
+                float_precision_range(value).start == value
+            ):
+                intervals.append((value, value + 1))
+            else:
+                unrepresentable.append(value)
+        return cls(intervals), unrepresentable
+
+    @classmethod
+    def _from_iterable(cls, values: Iterable[object], /) -> "CmdRangeSet":
+        range_set, unrepresentable = cls._partition(values)
+        if unrepresentable:
+            raise ValueError(
+                f"{unrepresentable[0]!r} is not a representable CustomModelData value",
+            )
+        return range_set
+
+    @classmethod
+    def _coerce(
+        cls,
+        other: "CmdRangeSetLike",
+        /,
+        *,
+        strict: bool = True,
+    ) -> "CmdRangeSet":
+        if isinstance(other, CmdRangeSet):
+            return other
+        elif isinstance(other, (CmdPrefix, CmdPrefix.Slice)):
+            return other.to_range_set()
+        elif strict:
+            return cls._from_iterable(other)
+        return cls._partition(other)[0]
+
+    @staticmethod
+    def _comparable(other: object, /) -> bool:
+        return isinstance(other, (Set, CmdPrefix, CmdPrefix.Slice))
+
+    def union(self, /, *others: "CmdRangeSetLike") -> "CmdRangeSet":
+        intervals = list(self.intervals)
+        for other in others:
+            intervals.extend(self._coerce(other).intervals)
+        return CmdRangeSet(intervals)
+
+    def intersection(self, /, *others: "CmdRangeSetLike") -> "CmdRangeSet":
+        result = self
+        for other in others:
+            left = result.intervals
+            right = self._coerce(other, strict=False).intervals
+            intervals = []
+            i = j = 0
+            while i < len(left) and j < len(right):
+                start = max(left[i][0], right[j][0])
+                stop = min(left[i][1], right[j][1])
+                if start < stop:
+                    intervals.append((start, stop))
+                if left[i][1] < right[j][1]:
+                    i += 1
+                else:
+                    j += 1
+            result = CmdRangeSet(intervals)
+        return result
+
+    def difference(self, /, *others: "CmdRangeSetLike") -> "CmdRangeSet":
+        result = self
+        for other in others:
+            right = self._coerce(other, strict=False).intervals
+            intervals = []
+            j = 0
+            for start, stop in result.intervals:
+                while j < len(right) and right[j][1] <= start:
+                    j += 1
+                k = j
+                while start < stop and k < len(right) and right[k][0] < stop:
+                    if right[k][0] > start:
+                        intervals.append((start, right[k][0]))
+                    start = max(start, right[k][1])
+                    k += 1
+                if start < stop:
+                    intervals.append((start, stop))
+            result = CmdRangeSet(intervals)
+        return result
+
+    def symmetric_difference(self, other: "CmdRangeSetLike", /) -> "CmdRangeSet":
+        other = self._coerce(other)
+        return (self - other) | (other - self)
+
+    def __and__(self, other: "CmdRangeSetLike", /) -> "CmdRangeSet":
+        if not isinstance(other, Iterable):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __or__(self, other: "CmdRangeSetLike", /) -> "CmdRangeSet":
+        if not isinstance(other, Iterable):
+            return NotImplemented
+        return self.union(other)
+
+    def __sub__(self, other: "CmdRangeSetLike", /) -> "CmdRangeSet":
+        if not isinstance(other, Iterable):
+            return NotImplemented
+        return self.difference(other)
+
+    def __xor__(self, other: "CmdRangeSetLike", /) -> "CmdRangeSet":
+        if not isinstance(other, Iterable):
+            return NotImplemented
+        return self.symmetric_difference(other)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+
+    def __rsub__(self, other: "CmdRangeSetLike", /) -> "CmdRangeSet":
+        if not isinstance(other, Iterable):
+            return NotImplemented
+        return self._coerce(other).difference(self)
+
+    def __le__(self, other: object, /) -> bool:
+        if not self._comparable(other):
+            return NotImplemented
+        return not self.difference(other)
+
+    def __ge__(self, other: object, /) -> bool:
+        if not self._comparable(other):
+            return NotImplemented
+        range_set, unrepresentable = self._partition_operand(other)
+        return not unrepresentable and not range_set.difference(self)
+
+    def __eq__(self, other: object, /) -> bool:
+        if not self._comparable(other):
+            return NotImplemented
+        range_set, unrepresentable = self._partition_operand(other)
+        return not unrepresentable and self.intervals == range_set.intervals
+
+    def __lt__(self, other: object, /) -> bool:
+        if not self._comparable(other):
+            return NotImplemented
+        return self <= other and self != other
+
+    def __gt__(self, other: object, /) -> bool:
+        if not self._comparable(other):
+            return NotImplemented
+        return self >= other and self != other
+
+    def __hash__(self, /) -> int:
+        # Equal to the hash of a frozenset of the same values, since the two
+        # compare equal.
+        try:
+            return self._hash
+        except AttributeError:
+            value = Set._hash(self)
+            object.__setattr__(self, "_hash", value)
+            return value
+
+    def _partition_operand(
+        self,
+        other: "CmdRangeSetLike",
+        /,
+    ) -> tuple["CmdRangeSet", list[object]]:
+        if isinstance(other, (CmdRangeSet, CmdPrefix, CmdPrefix.Slice)):
+            return self._coerce(other), []
+        return self._partition(other)
+
+    def isdisjoint(self, other: "CmdRangeSetLike", /) -> bool:
+        return not self.intersection(other)
+
+    def __len__(self, /) -> int:
+        return self.cumulative_lengths[-1] if self.cumulative_lengths else 0
+
+    def __bool__(self, /) -> bool:
+        return bool(self.intervals)
+
+    def __contains__(self, value: object, /) -> bool:
+        if not isinstance(value, int) or value not in range(0, CMD_MAXIMUM):
+            return False
+        n = bisect_right(self.intervals, (value, CMD_MAXIMUM)) - 1
+        return (
+            n >= 0 and
+            value < self.intervals[n][1] and
+            float_precision_range(value).start == value
+        )
+
+    def __iter__(self, /) -> Iterator[int]:
+        for start, stop in self.intervals:
+            for precision_range in _representable_ranges(start, stop):
+                yield from precision_range
+
+    def __getitem__(self, key: int, /) -> int:
+        key = range(0, len(self))[key]
+        n = bisect_right(self.cumulative_lengths, key)
+        key -= self.cumulative_lengths[n - 1] if n else 0
+        for precision_range in _representable_ranges(*self.intervals[n]):
+            if key < len(precision_range):
+                return precision_range[key]
+            key -= len(precision_range)
+        raise RuntimeError("unreachable code")
+
+    def __repr__(self, /) -> str:
+        return f"{type(self).__qualname__}({list(self.intervals)!r})"
+
+
+CmdRangeSetLike = Union[CmdRangeSet, CmdPrefix, CmdPrefix.Slice, Iterable[int]]
@@ -1,11 +1,14 @@
 __all__ = [
     "NbtCoerceable",
     "coerce_nbt_value",
+    "write_snbt",
+    "dump_snbt",
 ]
 
 
 from collections.abc import Iterable, Mapping
-from typing import Union
+from io import StringIO
+from typing import TextIO, Union
 
 from nbtlib import (
     Base,
@@ -16,7 +19,15 @@ from nbtlib import (
     Compound,
     List,
     Array,
+    serialize_tag,
 )
+from nbtlib.literal.serializer import Serializer
+
+
+INT_MINIMUM = -(2 ** 31)
+INT_MAXIMUM = 2 ** 31 - 1
+
+_serializer = Serializer(compact=True)
 
 
 NbtCoerceable = Union[
@@ -87,3 +98,92 @@ def coerce_nbt_value(
     else:
         raise TypeError(f"{value!r} cannot be converted to an NBT tag")
     return value
+
+
+def _tag_type(value: NbtCoerceable) -> type:
+    """Return the type of NBT tag that `coerce_nbt_value` would produce."""
+    if isinstance(value, List):
+        return List
+    elif isinstance(value, Compound):
+        return Compound
+    elif isinstance(value, Base):
+        return type(value)
+    elif isinstance(value, bool):
+        return Byte
+    elif isinstance(value, int):
+        return Int
+    elif isinstance(value, float):
+        return Double
+    elif isinstance(value, str):
+        return String
+    elif isinstance(value, Mapping):
+        return Compound
+    return List
+
+
+def write_snbt(value: NbtCoerceable, file: TextIO):
+    """
+    Write the compact SNBT representation of a value to a text stream.
+
+    The output is identical to serializing the result of :func:`coerce_nbt_value`,
+    but it is written incrementally without building an intermediate NBT tree.
+
+    Arguments:
+    value -- the value to serialize
+    file -- the text stream the SNBT is written to
+    """
+    write = file.write
+    if isinstance(value, Compound) or (
+        isinstance(value, Mapping) and not isinstance(value, Base)
+    ):
+        write("{")
+        for n, (k, v) in enumerate(value.items()):
+            if n:
+                write(",")
+            write(_serializer.stringify_compound_key(k))
+            write(":")
+            write_snbt(v, file)
+        write("}")
+    elif isinstance(value, Base) and not isinstance(value, List):
+        write(serialize_tag(value, compact=True))
+    elif isinstance(value, bool):
+        write("1b" if value else "0b")
+    elif isinstance(value, int):
+        if value < INT_MINIMUM or value > INT_MAXIMUM:
+            raise ValueError(f"{value!r} is out of range for an Int tag")
+        write(int.__repr__(value))
+    elif isinstance(value, float):
+        write(float.__repr__(value))
+        write("d")
+    elif isinstance(value, str):
+        write(_serializer.escape_string(value))
+    elif isinstance(value, Iterable):
+        write("[")
+        item_type = None
+        for n, v in enumerate(value):
+            if n:
+                write(",")
+                if _tag_type(v) is not item_type:
+                    raise TypeError(
+                        f"{v!r} should be a {item_type.__name__} tag"
+                    )
+            else:
+                item_type = _tag_type(v)
+            write_snbt(v, file)
+        write("]")
+    else:
+        raise TypeError(f"{value!r} cannot be converted to an NBT tag")
+
+
+def dump_snbt(value: NbtCoerceable) -> str:
+    """
+    Return the compact SNBT representation of a value.
+
+    See :func:`write_snbt` for details.
+
+    Arguments:
+    value -- the value to serialize
+    """
+    buffer = StringIO()
+    write_snbt(value, buffer)
+    return buffer.getvalue()
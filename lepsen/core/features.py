@@ -4,12 +4,15 @@ __all__ = [
     "ConflictingFeatureValues",
     "NontrivialFeaturePath",
     "FeatureStorage",
+    "FeatureSnapshot",
 ]
 
 
-from collections.abc import Iterator, Iterable, MutableMapping
+from collections.abc import Iterator, Iterable, Mapping, MutableMapping
 from typing import Optional, Union
 from dataclasses import dataclass, field
+from hashlib import blake2b
+from types import MappingProxyType
 
 from beet import Context
 
@@ -22,7 +25,13 @@ from nbtlib import (
     Base,
     Byte,
     Compound,
+    List,
+
+    # SNBT parsing and serialization.
+    parse_nbt,
+    serialize_tag,
 )
+from nbtlib.literal.serializer import Serializer
 
 from .coerce_nbt import coerce_nbt_value, NbtCoerceable
 
@@ -224,3 +233,167 @@ class FeatureStorage(MutableMapping[Union[str, Path], Base]):
 
     def __call__(self, feature: Union[str, Path], value: NbtCoerceable = Byte(1)):
         self[feature] = value
+
+    def snapshot(self) -> "FeatureSnapshot":
+        """Return an immutable, hashable snapshot of the features defined so far."""
+        return FeatureSnapshot.from_compound(self.compound, self.container_paths)
+
+
+_serializer = Serializer(compact=True)
+
+
+def _canonical_snbt(value: Base) -> str:
+    """
+    Return the compact SNBT of a tag with compound keys sorted recursively.
+
+    Compounds compare equal regardless of key order, so sorting the keys gives
+    equal values the same representation.
+    """
+    if isinstance(value, Compound):
+        return "{" + ",".join(
+            f"{_serializer.stringify_compound_key(k)}:{_canonical_snbt(value[k])}"
+            for k in sorted(value)
+        ) + "}"
+    elif isinstance(value, List):
+        return "[" + ",".join(map(_canonical_snbt, value)) + "]"
+    return serialize_tag(value, compact=True)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class FeatureSnapshot(Mapping[str, "FeatureSnapshot"]):
+    """
+    Immutable snapshot of the contents of a :class:`FeatureStorage`.
+
+    Each node of the snapshot is either a feature container, whose children are
+    accessible through the mapping interface, or a leaf holding the SNBT form of
+    a single feature value, with compound keys sorted. Every node carries a
+    Merkle-style digest computed from the digests of its children, so comparing
+    or hashing two snapshots (or any two of their subtrees) never requires
+    walking the underlying values. Indexing with a `str` looks up a direct
+    child, while indexing with a :class:`Path` walks nested containers.
+
+    Digests depend neither on the order in which features were defined nor on
+    the key order of compound values, which matches the order-independence
+    guarantee of :class:`FeatureStorage`.
+    """
+
+    digest: bytes
+    snbt: Optional[str] = None
+    children: Mapping[str, "FeatureSnapshot"] = field(
+        default_factory=lambda: MappingProxyType({}),
+        repr=False,
+    )
+
+    @classmethod
+    def from_compound(
+        cls,
+        compound: Compound,
+        container_paths: Iterable[Path],
+    ) -> "FeatureSnapshot":
+        """
+        Create a snapshot of a feature compound.
+
+        Arguments:
+        compound -- the top level compound of a :class:`FeatureStorage`
+        container_paths -- paths of the compounds that are feature containers
+                           rather than feature values
+        """
+        if not isinstance(container_paths, (set, frozenset)):
+            container_paths = frozenset(container_paths)
+        return cls._container(compound, Path.from_accessors(), container_paths)
+
+    @classmethod
+    def _container(
+        cls,
+        compound: Compound,
+        path: Path,
+        container_paths: Union[set[Path], frozenset[Path]],
+    ) -> "FeatureSnapshot":
+        children = {}
+        for key in sorted(compound):
+            child_path = path[key]
+            if child_path in container_paths:
+                child = cls._container(compound[key], child_path, container_paths)
+            else:
+                child = cls._leaf(_canonical_snbt(compound[key]))
+            children[key] = child
+        digest = blake2b(b"c", digest_size=16)
+        for key, child in children.items():
+            encoded_key = key.encode()
+            digest.update(len(encoded_key).to_bytes(4, "little"))
+            digest.update(encoded_key)
+            digest.update(child.digest)
+        return cls(digest.digest(), children=MappingProxyType(children))
+
+    @classmethod
+    def _leaf(cls, snbt: str) -> "FeatureSnapshot":
+        return cls(blake2b(b"v" + snbt.encode(), digest_size=16).digest(), snbt)
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.snbt is not None
+
+    @property
+    def value(self) -> Base:
+        """Reconstruct the NBT value of this node as a newly allocated tag."""
+        if self.snbt is not None:
+            return parse_nbt(self.snbt)
+        return Compound((k, v.value) for k, v in self.children.items())
+
+    def __getitem__(self, key: Union[str, Path]) -> "FeatureSnapshot":
+        if not isinstance(key, Path):
+            return self.children[key]
+        node = self
+        for path_component in key:
+            if not isinstance(path_component, NamedKey):
+                raise NontrivialFeaturePath(key)
+            node = node.children[path_component.key]
+        return node
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.children)
+
+    def __len__(self) -> int:
+        return len(self.children)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FeatureSnapshot):
+            return NotImplemented
+        return self.digest == other.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    @staticmethod
+    def diff(
+        old: Optional["FeatureSnapshot"],
+        new: "FeatureSnapshot",
+    ) -> list[Path]:
+        """
+        Return the paths of features present in `new` but not in `old`.
+
+        Features whose value differs between the two snapshots are included, as
+        are features that replace a container of the same name or vice versa.
+        Subtrees with identical digests are skipped without being visited, so the
+        cost is proportional to the size of the changed subtrees. Removed features
+        can be found by swapping the arguments.
+
+        Arguments:
+        old -- the previous snapshot, or None to list every feature in `new`
+        new -- the current snapshot
+        """
+        paths = []
+        stack = [(old, new, Path.from_accessors())]
+        while stack:
+            old, new, path = stack.pop()
+            if old is not None and old.digest == new.digest:
+                continue
+            if new.is_leaf:
+                paths.append(path)
+                continue
+            old_children = (
+                old.children if old is not None and not old.is_leaf else {}
+            )
+            for key in reversed(new.children):
+                stack.append((old_children.get(key), new.children[key], path[key]))
+        return paths
@@ -0,0 +1,126 @@
+__all__ = [
+    "IncrementalOutputOptions",
+    "incremental_output",
+    "write_incremental",
+]
+
+
+from collections.abc import Iterable
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Optional
+import os
+
+from beet import Context, configurable
+from beet.contrib.autosave import Autosave
+
+from pydantic import BaseModel
+
+
+def _digest(raw: bytes) -> str:
+    return blake2b(raw, digest_size=16).hexdigest()
+
+
+def write_incremental(
+    files: Iterable[tuple[str, Any]],
+    directory: Path,
+    manifest: dict[str, str],
+    *,
+    fsync: bool = False,
+) -> tuple[list[str], list[str]]:
+    """
+    Write files to a directory, skipping files whose content has not changed.
+
+    The manifest maps relative paths to content digests from the previous write
+    and is updated in place. Files listed in the manifest that are no longer part
+    of the output are deleted. If the manifest is empty, the files already in the
+    directory are digested instead, so that unchanged files are still skipped and
+    files that are no longer part of the output are still deleted. Return the
+    relative paths that were written and the relative paths that were deleted.
+
+    Arguments:
+    files -- iterable of relative paths and beet file instances
+    directory -- the directory to write the files to
+    manifest -- digests of the files written to the directory by a previous call
+
+    Keyword Arguments:
+    fsync (= False) -- when true, every written file is flushed to disk in one
+                       batch after all files have been written
+    """
+    written = []
+    previous = dict(manifest)
+    if not previous and directory.is_dir():
+        # Without a manifest (for example after the cache was cleared), files
+        # left over by earlier writes are only known from the directory itself.
+        previous = {
+            target.relative_to(directory).as_posix(): _digest(target.read_bytes())
+            for target in directory.rglob("*")
+            if target.is_file()
+        }
+    manifest.clear()
+    for path, file in files:
+        raw = file.ensure_serialized()
+        if isinstance(raw, str):
+            raw = raw.encode()
+        digest = _digest(raw)
+        manifest[path] = digest
+        target = directory / path
+        if previous.pop(path, None) == digest and target.is_file():
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(raw)
+        written.append(path)
+
+    deleted = []
+    for path in previous:
+        target = directory / path
+        if target.is_file():
+            target.unlink()
+            deleted.append(path)
+        for parent in target.parents:
+            if parent == directory or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+    if fsync:
+        for path in written:
+            fd = os.open(directory / path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+    return written, deleted
+
+
+class IncrementalOutputOptions(BaseModel):
+    directory: str
+    name: Optional[str] = None
+    fsync: bool = False
+
+
+@configurable(name="lepsen_incremental_output", validator=IncrementalOutputOptions)
+def incremental_output(ctx: Context, opts: IncrementalOutputOptions):
+    """
+    Write the data pack to a directory at the end of the build, skipping unchanged files.
+
+    Content digests of the written files are kept in the project cache, so only
+    files that changed since the previous build are written and files that are
+    no longer generated are removed. This keeps modification times stable for
+    file watchers and rsync. The pack is always written as a directory. The
+    writer is registered as an output handler, so it runs once the project has
+    set the final name, description and pack format of the data pack.
+    """
+
+    def write(ctx: Context):
+        name = opts.name or ctx.data.name or ctx.project_id
+        directory = ctx.directory / opts.directory / name
+        cache = ctx.cache["lepsen_incremental_output"]
+        manifest = cache.json.setdefault(str(directory), {})
+        write_incremental(
+            ctx.data.list_files(),
+            directory,
+            manifest,
+            fsync=opts.fsync,
+        )
+
+    ctx.inject(Autosave).add_output(write)
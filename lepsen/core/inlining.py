@@ -0,0 +1,135 @@
+__all__ = [
+    "InlinedFunction",
+    "inline_functions",
+]
+
+
+from collections import Counter
+from collections.abc import Container
+from dataclasses import dataclass
+from typing import Optional
+import re
+
+from beet import DataPack, Function, NamespaceFile, TextFileBase
+
+from .tree_shaking import _references
+
+
+_execute_run_function = re.compile(
+    r"execute (?P<subcommands>.+) run function (?P<function>\S+)"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class InlinedFunction:
+    """A private function whose body was inlined into its only caller."""
+
+    function: str
+    caller: str
+    commands: int
+
+    def __str__(self) -> str:
+        return f"Inlined {self.function} ({self.commands} command(s)) into {self.caller}"
+
+
+def _commands(function: Function) -> list[str]:
+    return [
+        line for line in map(str.strip, function.lines)
+        if line and not line.startswith("#")
+    ]
+
+
+def _inline_call(line: str, name: str, body: list[str]) -> Optional[list[str]]:
+    """Return the commands replacing `line` if it can be inlined, or None."""
+
+    if any(
+        command.startswith(("$", "return ")) or " run return " in command
+        for command in body
+    ):
+        # Returning would exit the caller instead, and macro lines can only be
+        # expanded with the arguments passed to the function itself.
+        return None
+    if line == f"function {name}":
+        return body
+    match = _execute_run_function.fullmatch(line)
+    if not match or match["function"] != name or len(body) != 1:
+        return None
+    subcommands = match["subcommands"]
+    if subcommands.startswith("store ") or " store " in subcommands:
+        # The stored result of a function call differs from that of its command.
+        return None
+    command = body[0]
+    if command.startswith("execute "):
+        return [f"execute {subcommands} {command.removeprefix('execute ')}"]
+    return [f"execute {subcommands} run {command}"]
+
+
+def inline_functions(
+    pack: DataPack,
+    private_prefix: str,
+    *,
+    unscanned: Container[tuple[type[NamespaceFile], str]] = (),
+) -> list[InlinedFunction]:
+    """
+    Inline private functions that are called from a single place in the pack.
+
+    A private function is inlined when the only reference to it anywhere in the
+    pack is a `function` command in another function. Unconditional calls are
+    replaced with the whole body of the function. Calls through `execute ... run
+    function` are only replaced when the function consists of a single command,
+    in which case the `execute` subcommands are merged with that command, and
+    never when the result of the call is stored. Functions containing `return`
+    commands or macro lines, functions referenced by tags, by `schedule`
+    commands or by themselves, and public functions are left untouched. Return a
+    report of the inlined functions in the order they were inlined.
+
+    Arguments:
+    pack -- the compiled data pack to optimize
+    private_prefix -- the resource location prefix of functions that are only
+                      referenced from within the pack
+
+    Keyword Arguments:
+    unscanned (= ()) -- file types and names of resources known not to reference
+                        private functions, as in :func:`prune_unreachable`;
+                        they are neither read nor inlined, except for tags,
+                        which are always read
+    """
+    references = Counter()
+    callers: dict[str, str] = {}
+    for file_type in pack.get_file_types():
+        if not issubclass(file_type, TextFileBase):
+            continue
+        for name, resource in pack[file_type].items():
+            if (file_type, name) in unscanned and file_type.scope[0] != "tags":
+                continue
+            for reference in _references(resource.text):
+                references[reference] += 1
+                if file_type is Function:
+                    callers[reference] = name
+
+    report = []
+    for name in sorted(pack.functions):
+        if (
+            not name.startswith(private_prefix) or
+            (Function, name) in unscanned or
+            references[name] != 1
+        ):
+            continue
+        caller = callers.get(name)
+        if caller is None or caller == name:
+            continue
+        body = _commands(pack.functions[name])
+        lines = pack.functions[caller].lines
+        for n, line in enumerate(lines):
+            if (replacement := _inline_call(line.strip(), name, body)) is not None:
+                lines[n:n + 1] = replacement
+                break
+        else:
+            continue
+        del pack.functions[name]
+        # The calls made by the inlined body are now made by its caller.
+        for reference in _references("\n".join(body)):
+            if callers.get(reference) == name:
+                callers[reference] = caller
+        report.append(InlinedFunction(name, caller, len(body)))
+    return report
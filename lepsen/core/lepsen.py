@@ -10,12 +10,22 @@ from beet.contrib.lantern_load import base_data_pack as lantern_load
 from pydantic import BaseModel
 
 from .markdown_iterator import markdown_iterator
+from .plugin import config_to_iter, feature_set, lepsen_cached
 
 
 class LepsenCoreOptions(BaseModel):
-    pass
+    workers: int = 1
+
+    class Config:
+        extra = "allow"
 
 
 @configurable(name="lepsen", validator=LepsenCoreOptions)
 def lepsen_core(ctx: Context, opts: LepsenCoreOptions):
-    pass
+    """Add the features enabled in the `lepsen` config to the current pack."""
+
+    lepsen_cached(
+        ctx,
+        feature_set(config_to_iter(opts.dict())),
+        workers=opts.workers,
+    )
@@ -0,0 +1,325 @@
+__all__ = [
+    "ModelOverrideIssue",
+    "ModelOverrideAuditOptions",
+    "iter_model_overrides",
+    "audit_model_overrides",
+    "model_override_audit",
+    "merge_model_overrides",
+    "ItemModelOverrides",
+    "ModelOverrideGenerationOptions",
+    "model_override_generation",
+]
+
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal, Optional, Union
+from math import isfinite
+import json
+import logging
+import re
+import struct
+
+from beet import Context, ErrorMessage, Model, configurable
+
+from pydantic import BaseModel
+
+from .cmd import CmdPrefix, float_precision_range
+
+
+logger = logging.getLogger(__name__)
+
+_whitespace = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def _skip(text: str, index: int, expected: Optional[str] = None) -> int:
+    """Skip whitespace and, if provided, a single expected delimiter."""
+
+    index = _whitespace.match(text, index).end()
+    if expected is not None:
+        if text[index:index + 1] != expected:
+            raise ValueError(f"Expected {expected!r} at offset {index} of model file")
+        index = _whitespace.match(text, index + 1).end()
+    return index
+
+
+def iter_model_overrides(text: str) -> Iterator[Mapping[str, Any]]:
+    """
+    Iterate over the `overrides` entries of a JSON model file.
+
+    Only the top level object of the model is walked, and each override is
+    decoded on its own, so the full JSON tree of the model is never built. Other
+    top level values are decoded and immediately discarded.
+
+    Arguments:
+    text -- the text content of a JSON model file
+    """
+    index = _skip(text, 0, "{")
+    if text[index:index + 1] == "}":
+        return
+    while True:
+        key, index = _decoder.raw_decode(text, index)
+        index = _skip(text, index, ":")
+        if key == "overrides":
+            index = _skip(text, index, "[")
+            if text[index:index + 1] != "]":
+                while True:
+                    override, index = _decoder.raw_decode(text, index)
+                    yield override
+                    index = _skip(text, index)
+                    if text[index:index + 1] != ",":
+                        break
+                    index = _skip(text, index + 1)
+            index = _skip(text, index, "]")
+        else:
+            _, index = _decoder.raw_decode(text, index)
+            index = _skip(text, index)
+        if text[index:index + 1] != ",":
+            break
+        index = _skip(text, index + 1)
+    _skip(text, index, "}")
+
+
+def _float32(value: Union[int, float]) -> float:
+    """Round a number to the nearest value representable as a 32-bit float."""
+
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+@dataclass(frozen=True, slots=True)
+class ModelOverrideIssue:
+    """A problem found with the CustomModelData of an item model override."""
+
+    kind: Literal["unrepresentable", "wrong_prefix", "unowned", "collision"]
+    model: str
+    index: int
+    custom_model_data: Any
+    target: str
+    conflicting_target: Optional[str] = None
+
+    def __str__(self) -> str:
+        location = (
+            f"Override {self.index} of {self.model} "
+            f"(custom_model_data {self.custom_model_data!r} -> {self.target})"
+        )
+        if self.kind == "unrepresentable":
+            return f"{location} is not representable as a 32-bit float"
+        elif self.kind == "wrong_prefix":
+            return f"{location} does not belong to the prefix of its namespace"
+        elif self.kind == "unowned":
+            return f"{location} does not belong to any known prefix"
+        return f"{location} collides with an override for {self.conflicting_target}"
+
+
+def audit_model_overrides(
+    prefixes: Mapping[str, CmdPrefix],
+    models: Iterable[tuple[str, Iterable[Mapping[str, Any]]]],
+) -> Iterator[ModelOverrideIssue]:
+    """
+    Check the CustomModelData of item model overrides against prefix tables.
+
+    Values are checked for float precision loss, for membership in the prefix
+    registered for the namespace of the override's target model (or in any
+    prefix, if the namespace has no registered prefix), and for collisions with
+    earlier overrides of the same model that have identical predicates once the
+    CustomModelData is rounded to a float. Collisions can only occur within a
+    single model, so memory use is bounded by the largest model rather than by
+    the size of the pack.
+
+    Arguments:
+    prefixes -- mapping of model namespaces to the prefix reserved for them
+    models -- iterable of model names and their overrides
+    """
+    all_prefixes = tuple(set(prefixes.values()))
+    for model, overrides in models:
+        seen: dict[tuple[Any, ...], Optional[str]] = {}
+        for index, override in enumerate(overrides):
+            predicate = override.get("predicate")
+            if not isinstance(predicate, Mapping):
+                continue
+            value = predicate.get("custom_model_data")
+            if value is None:
+                continue
+            target = str(override.get("model", ""))
+            issue = dict(
+                model=model,
+                index=index,
+                custom_model_data=value,
+                target=target,
+            )
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or not isfinite(value)
+                or value != int(value)
+            ):
+                yield ModelOverrideIssue("unrepresentable", **issue)
+                continue
+            value = int(value)
+            if float_precision_range(abs(value)).start != abs(value):
+                yield ModelOverrideIssue("unrepresentable", **issue)
+            namespace = target.partition(":")[0] if ":" in target else "minecraft"
+            if expected := prefixes.get(namespace):
+                if value not in expected:
+                    yield ModelOverrideIssue("wrong_prefix", **issue)
+            elif not any(value in prefix for prefix in all_prefixes):
+                yield ModelOverrideIssue("unowned", **issue)
+            key = (_float32(value), *sorted(
+                (k, json.dumps(v, sort_keys=True))
+                for k, v in predicate.items()
+                if k != "custom_model_data"
+            ))
+            if key in seen and seen[key] != target:
+                yield ModelOverrideIssue(
+                    "collision",
+                    conflicting_target=seen[key],
+                    **issue,
+                )
+            seen[key] = target
+
+
+class ModelOverrideAuditOptions(BaseModel):
+    prefixes: dict[str, int] = {}
+    strict: bool = False
+
+
+@configurable(name="lepsen_model_override_audit", validator=ModelOverrideAuditOptions)
+def model_override_audit(ctx: Context, opts: ModelOverrideAuditOptions):
+    """
+    Audit the CustomModelData of every item model override in the resource pack.
+
+    Model files that have not been loaded yet are read straight from their source
+    and parsed incrementally by :func:`iter_model_overrides` without being cached
+    by the pack. Issues are logged as warnings, or raised as a single error when
+    the `strict` option is enabled.
+    """
+    prefixes = {k: CmdPrefix(v) for k, v in opts.prefixes.items()}
+
+    def models() -> Iterator[tuple[str, Iterable[Mapping[str, Any]]]]:
+        for name, model in ctx.assets.models.items():
+            content = model.get_content()
+            if isinstance(content, bytes):
+                content = content.decode()
+            if isinstance(content, str):
+                yield name, iter_model_overrides(content)
+            else:
+                yield name, content.get("overrides", ())
+
+    issues = 0
+    for issue in audit_model_overrides(prefixes, models()):
+        issues += 1
+        logger.warning("%s", issue)
+    if issues and opts.strict:
+        raise ErrorMessage(f"Found {issues} invalid CustomModelData override(s)")
+
+
+def _predicate_key(predicate: Mapping[str, Any]) -> str:
+    """Return a key identifying a predicate, treating 10001 and 10001.0 alike."""
+    predicate = dict(predicate)
+    value = predicate.get("custom_model_data")
+    if isinstance(value, float) and value.is_integer():
+        predicate["custom_model_data"] = int(value)
+    return json.dumps(predicate, sort_keys=True)
+
+
+def merge_model_overrides(
+    values: Sequence[int],
+    models: Sequence[str],
+    overrides: Iterable[Mapping[str, Any]] = (),
+) -> list[dict[str, Any]]:
+    """
+    Pair CustomModelData values with models and merge them into existing overrides.
+
+    The returned list is deduplicated and the overrides with CustomModelData are
+    sorted by it, so that the linear evaluation of overrides by the game matches
+    the numeric order of the values. Overrides without CustomModelData are kept
+    in their original order at the start of the list; since the game uses the
+    last matching override, existing overrides without CustomModelData that
+    follow one with CustomModelData are considered an error, as sorting would
+    change which of them applies. Two overrides with the same predicate but
+    different models are also considered an error.
+
+    Arguments:
+    values -- the CustomModelData values to assign, typically a :class:`CmdPrefix`
+              slice
+    models -- the models to assign each value to, in the same order as `values`
+    overrides -- existing overrides to merge the new overrides into
+    """
+    if len(models) > len(values):
+        raise ValueError(
+            f"Cannot assign {len(models)} models to {len(values)} "
+            "CustomModelData values"
+        )
+    merged: dict[str, dict[str, Any]] = {}
+    new_overrides = (
+        {"predicate": {"custom_model_data": value}, "model": model}
+        for value, model in zip(values, models)
+    )
+    seen_custom_model_data = False
+    for override in (*overrides, *new_overrides):
+        predicate = override.get("predicate", {})
+        if "custom_model_data" in predicate:
+            seen_custom_model_data = True
+        elif seen_custom_model_data:
+            raise ValueError(
+                f"Override for predicate {json.dumps(predicate, sort_keys=True)} "
+                "follows an override with CustomModelData"
+            )
+        key = _predicate_key(predicate)
+        if (existing := merged.get(key)) is None:
+            merged[key] = dict(override)
+        elif existing.get("model") != override.get("model"):
+            raise ValueError(
+                f"Conflicting overrides for predicate {key}: "
+                f"{existing.get('model')} and {override.get('model')}"
+            )
+    return sorted(
+        merged.values(),
+        key=lambda override: override.get("predicate", {}).get(
+            "custom_model_data", float("-inf")
+        ),
+    )
+
+
+class ItemModelOverrides(BaseModel):
+    prefix: int
+    start: int = 0
+    models: list[str]
+    parent: str = "minecraft:item/generated"
+
+
+class ModelOverrideGenerationOptions(BaseModel):
+    items: dict[str, ItemModelOverrides] = {}
+
+
+@configurable(
+    name="lepsen_model_override_generation",
+    validator=ModelOverrideGenerationOptions,
+)
+def model_override_generation(ctx: Context, opts: ModelOverrideGenerationOptions):
+    """
+    Generate sorted item model overrides from :class:`CmdPrefix` slices.
+
+    Each configured item is assigned consecutive values of its prefix starting at
+    the configured index. Overrides are merged into the item model if it already
+    exists in the resource pack, or into a new model using the configured parent
+    and the vanilla item texture otherwise.
+    """
+    for item, item_opts in opts.items.items():
+        name = item if ":" in item else f"minecraft:item/{item}"
+        values = CmdPrefix(item_opts.prefix)[
+            item_opts.start:item_opts.start + len(item_opts.models)
+        ]
+        if (model := ctx.assets.models.get(name)) is None:
+            namespace, _, path = name.partition(":")
+            model = Model({
+                "parent": item_opts.parent,
+                "textures": {"layer0": f"{namespace}:{path}"},
+            })
+            ctx.assets.models[name] = model
+        model.data["overrides"] = merge_model_overrides(
+            values,
+            item_opts.models,
+            model.data.get("overrides", ()),
+        )
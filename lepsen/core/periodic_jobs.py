@@ -0,0 +1,145 @@
+__all__ = [
+    "SCHEDULER_CYCLE",
+    "PeriodicJob",
+    "PeriodicJobs",
+    "PeriodicJobsOptions",
+    "balance_phases",
+    "periodic_jobs",
+]
+
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+from beet import Context, Function, FunctionTag, configurable
+
+from pydantic import BaseModel
+
+
+# Number of ticks after which `lepsen.current_tick` wraps around to 0.
+SCHEDULER_CYCLE = 16
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodicJob:
+    """A function executed every `period` ticks with an estimated cost per run."""
+
+    function: str
+    cost: float = 1.0
+    period: int = SCHEDULER_CYCLE
+
+    def __post_init__(self):
+        if self.period < 1 or SCHEDULER_CYCLE % self.period:
+            raise ValueError(
+                f"Expected a period dividing {SCHEDULER_CYCLE}, got {self.period}",
+            )
+        if self.cost < 0:
+            raise ValueError(f"Expected a non-negative cost, got {self.cost}")
+
+
+def balance_phases(jobs: Sequence[PeriodicJob]) -> list[int]:
+    """
+    Assign a phase offset to each job so that the worst per-tick load is small.
+
+    A job with period `p` and phase `o` runs on every tick `t` of the scheduler
+    cycle where `t % p == o`. Jobs are placed greedily, those with the shortest
+    period (and thus the fewest choices) first and otherwise in order of
+    decreasing cost, each on the phase that minimizes the highest load among the
+    ticks it would run on. Ties are broken by the total load of those ticks and
+    then by the lowest phase, so the assignment is deterministic. Return the
+    phase of each job in the order of `jobs`; a job listed twice is placed (and
+    run) twice.
+
+    Arguments:
+    jobs -- the jobs to assign phases to
+    """
+    load = [0.0] * SCHEDULER_CYCLE
+    phases = [0] * len(jobs)
+    for n in sorted(
+        range(len(jobs)),
+        key=lambda n: (jobs[n].period, -jobs[n].cost, jobs[n].function, n),
+    ):
+        job = jobs[n]
+        phase = min(
+            range(job.period),
+            key=lambda phase: (
+                max(load[phase::job.period]),
+                sum(load[phase::job.period]),
+                phase,
+            ),
+        )
+        for tick in range(phase, SCHEDULER_CYCLE, job.period):
+            load[tick] += job.cost
+        phases[n] = phase
+    return phases
+
+
+@dataclass(slots=True)
+class PeriodicJobs:
+    """
+    Registry of functions to execute periodically on the tick scheduler cycle.
+
+    Jobs are registered with an estimated cost instead of a fixed phase, and the
+    :func:`periodic_jobs` plugin assigns phases with :func:`balance_phases` once
+    the pipeline has finished.
+
+    The constructor takes an optional :class:`Context` parameter to allow for an
+    instance of this class to be referenced at any point during the pipeline.
+    The parameter is discarded and only serves to ensure the call signature of
+    the constructor is correct.
+    """
+
+    jobs: list[PeriodicJob]
+
+    def __init__(self, ctx: Optional[Context] = None):
+        self.jobs = []
+
+    def __call__(
+        self,
+        function: str,
+        cost: float = 1.0,
+        *,
+        period: int = SCHEDULER_CYCLE,
+    ):
+        self.jobs.append(PeriodicJob(function, cost, period))
+
+
+class PeriodicJobsOptions(BaseModel):
+    namespace: Optional[str] = None
+
+
+@configurable(name="lepsen_periodic_jobs", validator=PeriodicJobsOptions)
+def periodic_jobs(ctx: Context, opts: PeriodicJobsOptions):
+    """
+    Generate dispatch functions for the jobs registered in :class:`PeriodicJobs`.
+
+    A function added to the `minecraft:tick` tag checks `lepsen.current_tick` and
+    runs the function of the current phase, which in turn runs every job assigned
+    to that tick. Requires the `tick_scheduler` feature.
+    """
+    registry = ctx.inject(PeriodicJobs)
+    yield
+    if not registry.jobs:
+        return
+
+    prefix = f"{opts.namespace or ctx.project_id}:_lepsen/periodic_jobs"
+    ticks: list[list[str]] = [[] for _ in range(SCHEDULER_CYCLE)]
+    for job, phase in zip(registry.jobs, balance_phases(registry.jobs)):
+        for tick in range(phase, SCHEDULER_CYCLE, job.period):
+            ticks[tick].append(job.function)
+
+    dispatch = []
+    for tick, functions in enumerate(ticks):
+        if functions:
+            ctx.data.functions[f"{prefix}/tick_{tick}"] = Function([
+                f"function {function}" for function in sorted(functions)
+            ])
+            dispatch.append(
+                f"execute if score lepsen.current_tick lepsen.pvar matches {tick} "
+                f"run function {prefix}/tick_{tick}"
+            )
+    ctx.data.functions[f"{prefix}/dispatch"] = Function(dispatch)
+    ctx.data.function_tags.merge({
+        "minecraft:tick": FunctionTag({"values": [f"{prefix}/dispatch"]}),
+    })
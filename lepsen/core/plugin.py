@@ -1,16 +1,26 @@
 __all__ = [
+    "compile_functions",
     "lepsen",
+    "lepsen_cached",
 ]
 
 
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 from typing import Any, Dict, Optional
 from collections.abc import Iterable, Iterator, MutableSet, Mapping
-from functools import partial
+from functools import cache, partial
+from hashlib import sha256
 from importlib.abc import Traversable
+from importlib import metadata
 from importlib.resources import files
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+import json
+import logging
 
-from beet import Context, Plugin
+from beet import Context, DataPack, Function, Plugin
 from beet.toolchain.helpers import sandbox
 from beet.contrib.dundervar import beet_default as dundervar
 from beet.contrib.inline_function_tag import beet_default as inline_function_tag
@@ -21,9 +31,22 @@ from beet.contrib.render import render
 from lectern import Document
 from lectern.contrib.yaml_to_json import handle_yaml
 
-from mecha import Mecha
+from mecha import (
+    CompilationUnit,
+    Diagnostic,
+    DiagnosticCollection,
+    Mecha,
+    MechaOptions,
+)
+from mecha.serialize import FormattingOptions
+from mecha.utils import resolve_source_filename
 
 from .markdown_iterator import markdown_iterator
+from .tree_shaking import prune_unreachable
+from .inlining import inline_functions
+
+
+logger = logging.getLogger(__name__)
 
 
 def _version_check(feature: str, version: dict[str, int]) -> str:
@@ -77,14 +100,54 @@ version_prefix = {
 lectern_sources = {k: v for k, v in markdown_iterator(files(__package__))}
 
 
-def apply_document(ctx: Context, file: Traversable):
-    """Apply the contents of a Lectern document bundled with Lepsen Core."""
+# Digest of the installed package version and of the code that produces the
+# output of Lepsen, so that upgrading or editing Lepsen invalidates cached builds.
+package_digest = sha256(
+    "\0".join([
+        metadata.version("lepsen-core"),
+        *(
+            resource.read_text()
+            for resource in sorted(
+                files(__package__).iterdir(),
+                key=lambda resource: resource.name,
+            )
+            if resource.name.endswith(".py")
+        ),
+    ]).encode()
+).hexdigest()
+
+# Template globals defining the version and version check of each module.
+template_globals = {
+    **{
+        f"{k}_ver_{t}": version[k][t]
+        for k in version
+        for t in version[k]
+    },
+    **{f"{k}_version_check": version_check[k] for k in version_check},
+}
+
+
+@cache
+def document_text(file: Traversable) -> str:
+    """
+    Return the text of a Lectern document bundled with Lepsen Core.
+
+    Module prefixes are substituted into the text, and the result is kept for the
+    lifetime of the process so that repeated builds (such as with `beet watch`)
+    do not read and process the bundled documents again.
+    """
 
     text = file.read_text()
     for k in version_prefix:
         text = text.replace(f"__{k}_prefix__", version_prefix[k])
+    return text
+
+
+def apply_document(ctx: Context, file: Traversable):
+    """Apply the contents of a Lectern document bundled with Lepsen Core."""
+
     document = ctx.inject(Document)
-    document.add_markdown(text)
+    document.add_markdown(document_text(file))
 
 
 @dataclass(unsafe_hash=True)
@@ -99,10 +162,10 @@ class Feature(Plugin):
     def __init__(
         self,
         name: str,
-        deps: Optional[list[str]] = None
+        deps: Optional[list[str]] = None,
         *,
         action: Optional[Plugin] = None,
-        configurable: bool = False,
+        configurable: bool = True,
     ):
         self.name = name
         self.deps = [] if deps is None else deps
@@ -126,11 +189,12 @@ feature_db = {
         Feature("tick_scheduler", ["main"]),
         Feature("forceload", ["main", "yellow_shulker_box"]),
         Feature("player_head"),
+        Feature("player_head_cache", ["player_head", "forceload"]),
     ]
 }
 
 
-def add_feature(set: MutableSet[str], list: List[Feature], feature: Feature):
+def add_feature(set: MutableSet[str], list: list[Feature], feature: Feature):
     if feature.name not in set:
         set.add(feature.name)
         for feature_dep in feature.deps:
@@ -138,7 +202,7 @@ def add_feature(set: MutableSet[str], list: List[Feature], feature: Feature):
         list.append(feature)
 
 
-def feature_set(features: Iterable[str]) -> List[Feature]:
+def feature_set(features: Iterable[str]) -> list[Feature]:
     feature_set = set()
     feature_list = list()
     for feature_name in features:
@@ -153,19 +217,237 @@ def config_to_iter(config: dict[str, Any]) -> Iterator[str]:
             yield k
 
 
-def lepsen(ctx: Context, features: List[Feature]):
-    """Add the Lepsen core library to the current pack."""
+def _compile_shard(
+    version: str,
+    formatting: FormattingOptions,
+    sources: list[tuple[str, str]],
+) -> list[tuple[str, str, list[dict[str, Any]]]]:
+    """
+    Compile function sources in a worker process with a fresh Mecha instance.
+
+    Diagnostics are returned as their field values because they are exceptions,
+    which do not survive pickling.
+    """
+
+    mecha = Mecha(version=version, multiline=True, formatting=formatting)
+    results = []
+    for name, text in sources:
+        function = Function(text)
+        report = DiagnosticCollection()
+        mecha.compile(function, resource_location=name, report=report)
+        results.append((
+            name,
+            function.text,
+            [
+                {
+                    diagnostic_field.name: getattr(diagnostic, diagnostic_field.name)
+                    for diagnostic_field in fields(diagnostic)
+                    if diagnostic_field.name not in ("file", "filename")
+                }
+                for diagnostic in report.exceptions
+            ],
+        ))
+    return results
+
+
+def compile_functions(ctx: Context, functions: list[str], *, workers: int = 1):
+    """
+    Compile functions of the data pack with Mecha and multiline commands enabled.
+
+    Diagnostics are reported to the Mecha instance of the context like Mecha's own
+    plugin does, so they are logged and errors fail the build once it finishes.
+
+    With more than one worker, the sorted functions are split into contiguous
+    shards, one per worker process. Each worker compiles its shard with its own
+    Mecha instance for the same Minecraft version and formatting options. The
+    compiled text and diagnostics are merged back by name in sorted order, so the
+    output and the order of reported diagnostics do not depend on scheduling.
+    Workers only apply Mecha's built-in steps, so leave `workers` at 1 when the
+    pipeline registers its own Mecha extensions.
+
+    Arguments:
+    ctx -- the context whose data pack contains the functions
+    functions -- the names of the functions to compile
+
+    Keyword Arguments:
+    workers (= 1) -- the number of processes to compile functions in
+    """
+
+    mecha = ctx.inject(Mecha)
+    if workers <= 1 or len(functions) <= 1:
+        if functions:
+            mecha.compile(
+                ctx.data,
+                match=functions,
+                multiline=True,
+                report=mecha.diagnostics,
+            )
+        return
+
+    opts = ctx.validate("mecha", MechaOptions)
+    version = opts.version or ctx.minecraft_version
+    names = sorted(functions)
+    workers = min(workers, len(names))
+    shards = [
+        [
+            (name, ctx.data.functions[name].text)
+            for name in names[n * len(names) // workers:(n + 1) * len(names) // workers]
+        ]
+        for n in range(workers)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            partial(_compile_shard, version, opts.formatting),
+            shards,
+        )
+        for shard in results:
+            for name, text, diagnostics in shard:
+                function = ctx.data.functions[name]
+                filename = resolve_source_filename(function, ctx.directory)
+                mecha.database[function] = CompilationUnit(
+                    source=function.text,
+                    filename=str(filename) if filename else None,
+                    resource_location=name,
+                    pack=ctx.data,
+                )
+                function.text = text
+                for diagnostic in diagnostics:
+                    mecha.diagnostics.add(Diagnostic(
+                        **diagnostic,
+                        file=function,
+                        filename=str(filename) if filename else None,
+                    ))
+
+
+def lepsen(ctx: Context, features: list[Feature], *, workers: int = 1):
+    """
+    Add the Lepsen core library to the current pack.
+
+    Every function in the pack is rendered and compiled with multiline commands
+    enabled, so the functions of the pack Lepsen is added to can use the same
+    syntax as Lepsen itself. Private functions with a single caller are then
+    inlined into it, and private functions, tags and loot tables that are
+    unreachable are removed.
+
+    Keyword Arguments:
+    workers (= 1) -- the number of processes to compile functions in, see
+                     :func:`compile_functions`
+    """
 
     ctx.require(dundervar)
     ctx.require(inline_function_tag)
-    for k in version:
-        for t in version[k]:
-            ctx.template.env.globals[f"{k}_ver_{t}"] = version[k][t]
-    for k in version_check:
-        ctx.template.env.globals[f"{k}_version_check"] = version_check[k]
+    ctx.template.env.globals.update(template_globals)
     document = ctx.inject(Document)
     document.loaders.append(handle_yaml)
+    existing_resources = {
+        (file_type, name)
+        for file_type in ctx.data.get_file_types()
+        for name in ctx.data[file_type]
+    }
     ctx.require(*features)
     ctx.require(render(data_pack={"functions": ["*"]}))
-    mecha = ctx.inject(Mecha)
-    mecha.compile(ctx.data, multiline=True)
+    compile_functions(ctx, list(ctx.data.functions), workers=workers)
+    for inlined in inline_functions(
+        ctx.data,
+        "lepsen:core/_private/",
+        unscanned=existing_resources,
+    ):
+        logger.info("%s", inlined)
+    prune_unreachable(
+        ctx.data,
+        "lepsen:core/_private/",
+        unscanned=existing_resources,
+    )
+
+
+def lepsen_cache_key(ctx: Context, features: list[Feature]) -> str:
+    """Return a key identifying the output of :func:`lepsen` for a feature list."""
+
+    key = {
+        "features": sorted(feature.name for feature in features),
+        "version": version,
+        "minecraft_version": ctx.minecraft_version,
+        "package": package_digest,
+        # Output compiled by another version of the toolchain may differ.
+        "toolchain": {
+            package: metadata.version(package)
+            for package in ("beet", "mecha", "lectern")
+        },
+        "sources": {
+            feature.name: sha256(
+                document_text(lectern_sources[feature.name]).encode()
+            ).hexdigest()
+            for feature in features
+            if feature.name in lectern_sources
+        },
+    }
+    return sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+# Serialized output of :func:`lepsen` for each cache key built or loaded by this
+# process, so that rebuilds (such as with `beet watch`) skip the project cache.
+warm_builds: dict[str, DataPack] = {}
+
+
+def _detached_copy(pack: DataPack) -> DataPack:
+    """Return a copy of the namespace files of a pack, serialized in memory."""
+
+    copy = DataPack()
+    for name, file in pack.all():
+        file = file.copy()
+        file.ensure_serialized()
+        copy[name] = file
+    return copy
+
+
+def lepsen_cached(ctx: Context, features: list[Feature], *, workers: int = 1):
+    """
+    Add the Lepsen core library to the current pack using a cached build.
+
+    The output of Lepsen only depends on the selected features and the module
+    versions, so it is built once per key in an isolated pipeline and saved to
+    the project cache. Later builds merge the saved functions, tags and loot
+    tables into the data pack without rendering or compiling anything. The
+    output is also kept in memory, so later builds in the same process (such as
+    with `beet watch`) do not read the project cache again either. The functions
+    that were already in the pack are rendered and compiled like in
+    :func:`lepsen`.
+
+    Keyword Arguments:
+    workers (= 1) -- the number of processes to compile the functions of the
+                     pack in, see :func:`compile_functions`
+    """
+
+    pack_functions = list(ctx.data.functions)
+    key = lepsen_cache_key(ctx, features)
+    if (warm := warm_builds.get(key)) is None:
+        cache = ctx.cache["lepsen"]
+        path = cache.get_path(key)
+        if path.is_dir():
+            warm = warm_builds[key] = _detached_copy(DataPack(path=path))
+        else:
+            def build(child_ctx: Context):
+                lepsen(child_ctx, features)
+                # Save to a temporary directory first so that an interrupted
+                # build never leaves a partial directory behind at the final path.
+                temporary_path = Path(mkdtemp(dir=cache.directory))
+                try:
+                    child_ctx.data.save(path=temporary_path, overwrite=True)
+                    temporary_path.rename(path)
+                except OSError:
+                    if not path.is_dir():
+                        raise
+                finally:
+                    rmtree(temporary_path, ignore_errors=True)
+                warm_builds[key] = _detached_copy(child_ctx.data)
+
+            sandbox(build)(ctx)
+    if warm is not None:
+        ctx.data.merge(_detached_copy(warm))
+
+    if pack_functions:
+        ctx.require(dundervar)
+        ctx.require(inline_function_tag)
+        ctx.template.env.globals.update(template_globals)
+        ctx.require(render(data_pack={"functions": pack_functions}))
+        compile_functions(ctx, pack_functions, workers=workers)
@@ -0,0 +1,106 @@
+__all__ = [
+    "prune_unreachable",
+]
+
+
+from collections.abc import Container, Iterator
+import re
+
+from beet import DataPack, Function, FunctionTag, LootTable, NamespaceFile, TextFileBase
+
+
+# Matches anything that looks like a resource location or a tag reference with
+# an explicit namespace. References relying on the implicit `minecraft`
+# namespace or assembled by macro lines at runtime are missed, so only resources
+# under the private prefix, which are always referenced in full, are removed.
+_reference = re.compile(r"#?[a-z0-9_.-]+:[a-z0-9_./-]+")
+
+# Resource types that are removed when unreachable, mapped to the prefix of
+# their names in the returned report. Resources of every other type are kept.
+_prunable: dict[type[NamespaceFile], str] = {
+    Function: "",
+    FunctionTag: "#",
+    LootTable: "loot_table:",
+}
+
+
+def _references(text: str) -> Iterator[str]:
+    return (match.group() for match in _reference.finditer(text))
+
+
+def prune_unreachable(
+    pack: DataPack,
+    private_prefix: str,
+    *,
+    unscanned: Container[tuple[type[NamespaceFile], str]] = (),
+) -> list[str]:
+    """
+    Remove private functions, function tags and loot tables nothing can reach.
+
+    Every resource other than a function, function tag or loot table whose name
+    starts with `private_prefix` is a root, including the `minecraft:load` and
+    `minecraft:tick` tags. Reachability follows every resource location
+    mentioned in the text of a reached resource of any type, such as the reward
+    function of an advancement, the predicates and loot tables referenced by
+    predicates and item modifiers, or the values of a tag. Return the names of
+    the removed resources, with function tags prefixed by `#` and loot tables
+    prefixed by `loot_table:`.
+
+    Arguments:
+    pack -- the data pack to prune
+    private_prefix -- the resource location prefix of resources that are only
+                      referenced from within the pack (for example,
+                      `lepsen:core/_private/`)
+
+    Keyword Arguments:
+    unscanned (= ()) -- file types and names of resources known not to reference
+                        private resources, such as the resources that were in
+                        the pack before Lepsen was added; they are kept, but
+                        their text is never read unless they are tags, which
+                        may have had private values merged into them
+    """
+    proxies = {file_type: pack[file_type] for file_type in pack.get_file_types()}
+    tag_types = [
+        file_type for file_type in proxies
+        if file_type.scope[0] == "tags"
+    ]
+    resource_types = [
+        file_type for file_type in proxies
+        if file_type.scope[0] != "tags" and issubclass(file_type, TextFileBase)
+    ]
+
+    queue: list[tuple[type[NamespaceFile], str]] = [
+        (file_type, name)
+        for file_type, proxy in proxies.items()
+        for name in proxy
+        if file_type not in _prunable or not name.startswith(private_prefix)
+    ]
+    reached: set[tuple[type[NamespaceFile], str]] = set()
+    while queue:
+        file_type, name = queue.pop()
+        if (file_type, name) in reached:
+            continue
+        reached.add((file_type, name))
+        if (
+            not issubclass(file_type, TextFileBase) or
+            (file_type, name) in unscanned and file_type not in tag_types
+        ):
+            continue
+        for reference in _references(proxies[file_type][name].text):
+            if reference.startswith("#"):
+                candidates, reference = tag_types, reference[1:]
+            else:
+                candidates = resource_types
+            queue.extend(
+                (candidate, reference) for candidate in candidates
+                if reference in proxies[candidate]
+            )
+
+    removed = []
+    for file_type, kind in _prunable.items():
+        proxy = proxies[file_type]
+        for name in list(proxy):
+            if name.startswith(private_prefix) and (file_type, name) not in reached:
+                del proxy[name]
+                removed.append(kind + name)
+    return removed
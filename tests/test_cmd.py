@@ -0,0 +1,128 @@
+from random import Random
+import struct
+
+import pytest
+
+from lepsen.core import CmdPrefix, CmdRangeSet
+
+
+# Regions straddling the start of float precision loss and a region where only
+# every 128th value is representable.
+REGIONS = [
+    (2 ** 24 - 40, 2 ** 24 + 40),
+    (2 ** 30 + 1_000, 2 ** 30 + 2_000),
+]
+
+
+def representable(value):
+    return struct.unpack("f", struct.pack("f", value))[0] == value
+
+
+def random_intervals(rng, region, count):
+    low, high = region
+    intervals = []
+    for _ in range(count):
+        start = rng.randrange(low, high)
+        intervals.append((start, start + rng.randrange(0, 300)))
+    return intervals
+
+
+def test_prefix_and_full_slice_are_equal():
+    prefix = CmdPrefix(1)
+    assert prefix.to_range_set() == prefix[:].to_range_set()
+    assert hash(prefix.to_range_set()) == hash(prefix[:].to_range_set())
+
+
+def test_unrepresentable_stop_is_normalized():
+    a = CmdRangeSet([(2 ** 24, 2 ** 24 + 1)])
+    b = CmdRangeSet([(2 ** 24, 2 ** 24 + 2)])
+    assert a == b
+    assert hash(a) == hash(b)
+    assert not a < b
+    assert not a > b
+    assert a <= b and a >= b
+
+
+def test_unrepresentable_gap_is_merged():
+    a = CmdRangeSet([(2 ** 24, 2 ** 24 + 1), (2 ** 24 + 1, 2 ** 24 + 3)])
+    assert a.intervals == ((2 ** 24, 2 ** 24 + 3),)
+    assert list(a) == [2 ** 24, 2 ** 24 + 2]
+
+
+def test_empty_intervals_are_dropped():
+    assert CmdRangeSet([(2 ** 24 + 1, 2 ** 24 + 2), (5, 5)]) == CmdRangeSet()
+    assert not CmdRangeSet([(2 ** 24 + 1, 2 ** 24 + 2)])
+
+
+@pytest.mark.parametrize("prefix", [1, 500, 999])
+def test_slice_matches_prefix_values(prefix):
+    target = CmdPrefix(prefix)
+    for key in [slice(0, 20_000), slice(9_990, 10_020), slice(-50, None)]:
+        assert set(target[key].to_range_set()) == set(target[key])
+
+
+@pytest.mark.parametrize("region", REGIONS)
+def test_operations_match_materialized_sets(region):
+    rng = Random(region[0])
+    for _ in range(200):
+        left = random_intervals(rng, region, rng.randrange(0, 4))
+        right = random_intervals(rng, region, rng.randrange(0, 4))
+        a, b = CmdRangeSet(left), CmdRangeSet(right)
+        expected_a = {
+            value for start, stop in left
+            for value in range(start, stop)
+            if representable(value)
+        }
+        expected_b = {
+            value for start, stop in right
+            for value in range(start, stop)
+            if representable(value)
+        }
+        assert set(a) == expected_a
+        assert len(a) == len(expected_a)
+        assert set(a | b) == expected_a | expected_b
+        assert set(a & b) == expected_a & expected_b
+        assert set(a - b) == expected_a - expected_b
+        assert set(a ^ b) == expected_a ^ expected_b
+        assert (a == b) == (expected_a == expected_b)
+        assert (a < b) == (expected_a < expected_b)
+        assert (a <= b) == (expected_a <= expected_b)
+        assert (a > b) == (expected_a > expected_b)
+        assert a.isdisjoint(b) == expected_a.isdisjoint(expected_b)
+        if a == b:
+            assert hash(a) == hash(b)
+        assert [a[n] for n in range(len(a))] == sorted(expected_a)
+
+
+def test_reflected_operators_with_plain_sets():
+    rs = CmdRangeSet([(1, 5)])
+    assert {1, 9} - rs == {9}
+    assert {1, 9} & rs == {1}
+    assert {9} | rs == {1, 2, 3, 4, 9}
+    assert {4, 6} ^ rs == {1, 2, 3, 6}
+    assert isinstance({1, 9} - rs, CmdRangeSet)
+
+
+def test_comparisons_with_plain_sets():
+    rs = CmdRangeSet([(1, 5)])
+    assert rs == {1, 2, 3, 4}
+    assert {1, 2, 3, 4} == rs
+    assert hash(rs) == hash(frozenset({1, 2, 3, 4}))
+    assert rs <= {1, 2, 3, 4, 5}
+    assert rs < {1, 2, 3, 4, 5}
+    assert rs >= {2, 3}
+    assert rs != [1, 2, 3, 4]
+    assert rs != {1, 2, 3, 4, -1}
+    assert rs < {1, 2, 3, 4, -1}
+    assert not rs >= {1, -1}
+
+
+def test_unrepresentable_operands():
+    rs = CmdRangeSet([(1, 5)])
+    assert rs & {1, -1, 2 ** 24 + 1, "x"} == {1}
+    assert rs - [2, 3.5] == {1, 3, 4}
+    assert rs.isdisjoint({-1, 7})
+    with pytest.raises(ValueError):
+        rs | {-1}
+    with pytest.raises(ValueError):
+        {2 ** 24 + 1} - rs
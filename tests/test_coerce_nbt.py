@@ -0,0 +1,54 @@
+from io import StringIO
+
+from nbtlib import Byte, Compound, IntArray, List, Short, String, serialize_tag
+
+import pytest
+
+from lepsen.core import coerce_nbt_value, dump_snbt, write_snbt
+
+
+VALUES = [
+    0,
+    -(2 ** 31),
+    2 ** 31 - 1,
+    True,
+    False,
+    1.5,
+    -0.0,
+    1e300,
+    "",
+    "quote\"and'apostrophe",
+    "back\\slash",
+    [],
+    [1, 2, 3],
+    [[1], [2.5]],
+    [{"a": 1}, {"b": "c"}],
+    {"": 1, "key with spaces": [True], "nested": {"x": {"y": []}}},
+    Short(7),
+    Byte(-3),
+    String("tag"),
+    IntArray([1, 2]),
+    Compound({"a": List[Short]([Short(1)])}),
+    ({"a": 0}, {"a": 1}),
+]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_matches_serialized_coerced_value(value):
+    expected = serialize_tag(coerce_nbt_value(value, deep_copy=True), compact=True)
+    assert dump_snbt(value) == expected
+    buffer = StringIO()
+    write_snbt(value, buffer)
+    assert buffer.getvalue() == expected
+
+
+def test_int_out_of_range():
+    with pytest.raises(ValueError):
+        dump_snbt(2 ** 31)
+
+
+def test_mixed_list_is_rejected():
+    with pytest.raises(TypeError):
+        dump_snbt([1, "a"])
+    with pytest.raises(TypeError):
+        coerce_nbt_value([1, "a"])
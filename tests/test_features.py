@@ -0,0 +1,59 @@
+from nbtlib import Path
+
+import pytest
+
+from lepsen.core import FeatureSnapshot, FeatureStorage, NontrivialFeaturePath
+
+
+def storage(features):
+    result = FeatureStorage()
+    for path, value in features.items():
+        result[path] = value
+    return result
+
+
+def diff(old, new):
+    return [str(path) for path in FeatureSnapshot.diff(old, new)]
+
+
+def test_mapping_contract_with_unusual_keys():
+    features = FeatureStorage()
+    features[Path.from_accessors()["a b"]] = 1
+    features["c.d"] = 2
+    snapshot = features.snapshot()
+    assert set(dict(snapshot)) == {"a b", "c"}
+    assert snapshot["a b"].snbt == "1"
+    assert snapshot[Path("c.d")].snbt == "2"
+    with pytest.raises(KeyError):
+        snapshot["c.d"]
+    with pytest.raises(NontrivialFeaturePath):
+        snapshot[Path("c[0]")]
+
+
+def test_digest_ignores_definition_and_key_order():
+    a = storage({"x.y": 1, "x.z": {"b": 1, "a": 2}, "w": "text"})
+    b = storage({"w": "text", "x.z": {"a": 2, "b": 1}, "x.y": 1})
+    assert a.snapshot() == b.snapshot()
+    assert hash(a.snapshot()) == hash(b.snapshot())
+    assert a.snapshot()["x"] == b.snapshot()["x"]
+
+
+def test_diff_from_nothing_lists_every_feature():
+    snapshot = storage({"x.y": 1, "x.z": 2, "w": 3}).snapshot()
+    assert diff(None, snapshot) == ["w", "x.y", "x.z"]
+
+
+def test_diff_lists_changed_and_added_features():
+    old = storage({"x.y": 1, "x.z": 2, "w": 3}).snapshot()
+    new = storage({"x.y": 1, "x.z": 5, "v.u": 4, "w": 3}).snapshot()
+    assert diff(old, new) == ["v.u", "x.z"]
+    assert diff(new, old) == ["x.z"]
+    assert diff(new, new) == []
+
+
+def test_diff_handles_leaf_replaced_by_container():
+    old = storage({"x": 1}).snapshot()
+    new = storage({"x.y": 1}).snapshot()
+    assert diff(old, new) == ["x.y"]
+    assert diff(new, old) == ["x"]
+
@@ -0,0 +1,36 @@
+from beet import Function
+
+from lepsen.core import write_incremental
+
+
+def files(**functions):
+    return [
+        (f"data/x/functions/{name}.mcfunction", Function([command]))
+        for name, command in functions.items()
+    ]
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    manifest = {}
+    write_incremental(files(a="say a", b="say b"), tmp_path, manifest)
+    written, deleted = write_incremental(
+        files(a="say a", b="say c"), tmp_path, manifest
+    )
+    assert written == ["data/x/functions/b.mcfunction"]
+    assert deleted == []
+
+
+def test_removed_files_are_deleted(tmp_path):
+    manifest = {}
+    write_incremental(files(a="say a", b="say b"), tmp_path, manifest)
+    written, deleted = write_incremental(files(a="say a"), tmp_path, manifest)
+    assert written == []
+    assert deleted == ["data/x/functions/b.mcfunction"]
+    assert not (tmp_path / "data/x/functions/b.mcfunction").exists()
+
+
+def test_stale_files_are_deleted_without_manifest(tmp_path):
+    write_incremental(files(a="say a", b="say b"), tmp_path, {})
+    written, deleted = write_incremental(files(a="say a"), tmp_path, {})
+    assert written == []
+    assert deleted == ["data/x/functions/b.mcfunction"]
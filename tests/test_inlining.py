@@ -0,0 +1,107 @@
+from beet import DataPack, Function, FunctionTag
+
+import pytest
+
+from lepsen.core import InlinedFunction, inline_functions
+
+
+PRIVATE = "x:_private/"
+
+
+def pack_with(main, **functions):
+    pack = DataPack()
+    pack["x:main"] = Function(main)
+    for name, lines in functions.items():
+        pack[f"{PRIVATE}{name}"] = Function(lines)
+    return pack
+
+
+@pytest.mark.parametrize("body", [
+    ["say a", "return 1"],
+    ["say a", "execute if entity @s run return fail"],
+    ["$say $(name)"],
+])
+def test_return_and_macro_bodies_are_not_inlined(body):
+    pack = pack_with([f"function {PRIVATE}f"], f=body)
+    assert inline_functions(pack, PRIVATE) == []
+    assert f"{PRIVATE}f" in pack.functions
+
+
+def test_stored_result_is_not_inlined():
+    pack = pack_with(
+        [f"execute store result score @s x run function {PRIVATE}f"],
+        f=["data get storage x:y z"],
+    )
+    assert inline_functions(pack, PRIVATE) == []
+
+
+def test_conditional_multi_command_body_is_not_inlined():
+    pack = pack_with(
+        [f"execute if entity @s run function {PRIVATE}f"],
+        f=["say a", "say b"],
+    )
+    assert inline_functions(pack, PRIVATE) == []
+
+
+def test_execute_conditions_are_merged_into_single_command():
+    pack = pack_with(
+        [
+            f"execute if entity @s run function {PRIVATE}plain",
+            f"execute if entity @s run function {PRIVATE}nested",
+        ],
+        plain=["say a"],
+        nested=["execute as @a run say b"],
+    )
+    assert inline_functions(pack, PRIVATE) == [
+        InlinedFunction(f"{PRIVATE}nested", "x:main", 1),
+        InlinedFunction(f"{PRIVATE}plain", "x:main", 1),
+    ]
+    assert pack.functions["x:main"].lines == [
+        "execute if entity @s run say a",
+        "execute if entity @s as @a run say b",
+    ]
+
+
+def test_chain_of_single_caller_functions_is_collapsed():
+    pack = pack_with(
+        ["say start", f"function {PRIVATE}a"],
+        a=["say a", f"function {PRIVATE}b"],
+        b=["# comment", "say b", f"function {PRIVATE}c"],
+        c=["say c"],
+    )
+    report = inline_functions(pack, PRIVATE)
+    assert [inlined.function for inlined in report] == [
+        f"{PRIVATE}a",
+        f"{PRIVATE}b",
+        f"{PRIVATE}c",
+    ]
+    assert all(inlined.caller == "x:main" for inlined in report)
+    assert pack.functions["x:main"].lines == ["say start", "say a", "say b", "say c"]
+    assert list(pack.functions) == ["x:main"]
+
+
+def test_shared_tagged_and_recursive_functions_are_kept():
+    pack = pack_with(
+        [f"function {PRIVATE}shared", f"function {PRIVATE}shared"],
+        shared=["say shared"],
+        tagged=["say tagged"],
+        loop=[f"function {PRIVATE}loop"],
+    )
+    pack["x:other"] = Function([f"function {PRIVATE}tagged"])
+    pack.function_tags["x:tag"] = FunctionTag({"values": [f"{PRIVATE}tagged"]})
+    assert inline_functions(pack, PRIVATE) == []
+
+
+def test_unscanned_functions_are_neither_read_nor_inlined():
+    pack = pack_with(
+        [f"function {PRIVATE}f", f"function {PRIVATE}g"],
+        f=["say f"],
+        g=["say g"],
+    )
+    pack["x:user"] = Function([f"function {PRIVATE}f"])
+    report = inline_functions(
+        pack,
+        PRIVATE,
+        unscanned={(Function, "x:user"), (Function, f"{PRIVATE}g")},
+    )
+    assert report == [InlinedFunction(f"{PRIVATE}f", "x:main", 1)]
@@ -0,0 +1,33 @@
+import pytest
+
+from lepsen.core import merge_model_overrides
+
+
+def test_float_custom_model_data_is_deduplicated():
+    existing = [{"predicate": {"custom_model_data": 10001.0}, "model": "a"}]
+    merged = merge_model_overrides([10001, 10002], ["a", "b"], existing)
+    assert [override["model"] for override in merged] == ["a", "b"]
+
+
+def test_float_custom_model_data_conflict_is_detected():
+    existing = [{"predicate": {"custom_model_data": 10001.0}, "model": "x"}]
+    with pytest.raises(ValueError):
+        merge_model_overrides([10001], ["a"], existing)
+
+
+def test_overrides_without_custom_model_data_stay_first():
+    existing = [
+        {"predicate": {"pulling": 1}, "model": "p"},
+        {"predicate": {"custom_model_data": 10003}, "model": "c"},
+    ]
+    merged = merge_model_overrides([10001, 10002], ["a", "b"], existing)
+    assert [override["model"] for override in merged] == ["p", "a", "b", "c"]
+
+
+def test_override_without_custom_model_data_after_one_with_it_is_rejected():
+    existing = [
+        {"predicate": {"custom_model_data": 10003}, "model": "c"},
+        {"predicate": {"pulling": 1}, "model": "p"},
+    ]
+    with pytest.raises(ValueError):
+        merge_model_overrides([10001], ["a"], existing)
@@ -0,0 +1,46 @@
+from itertools import product
+
+import pytest
+
+from lepsen.core import SCHEDULER_CYCLE, PeriodicJob, balance_phases
+
+
+def tick_loads(jobs, phases):
+    load = [0.0] * SCHEDULER_CYCLE
+    for job, phase in zip(jobs, phases):
+        for tick in range(phase, SCHEDULER_CYCLE, job.period):
+            load[tick] += job.cost
+    return load
+
+
+def test_phases_are_within_period():
+    jobs = [
+        PeriodicJob(f"x:job_{n}", cost, period)
+        for n, (cost, period) in enumerate(product([1, 2.5, 4], [1, 2, 4, 8, 16]))
+    ]
+    for job, phase in zip(jobs, balance_phases(jobs)):
+        assert 0 <= phase < job.period
+
+
+def test_equal_jobs_are_spread_evenly():
+    jobs = [PeriodicJob(f"x:job_{n}", 1, 4) for n in range(8)]
+    assert max(tick_loads(jobs, balance_phases(jobs))) == 2
+
+
+def test_duplicate_jobs_are_kept():
+    jobs = [PeriodicJob("x:job", 1, 2), PeriodicJob("x:job", 1, 2)]
+    phases = balance_phases(jobs)
+    assert len(phases) == 2
+    assert sorted(phases) == [0, 1]
+    assert sum(tick_loads(jobs, phases)) == 2 * SCHEDULER_CYCLE // 2
+
+
+def test_assignment_is_deterministic():
+    jobs = [PeriodicJob(f"x:job_{n}", n % 3 + 1, 2 ** (n % 5)) for n in range(20)]
+    assert balance_phases(jobs) == balance_phases(jobs)
+    assert balance_phases(list(reversed(jobs))) == list(reversed(balance_phases(jobs)))
+
+
+def test_invalid_period_is_rejected():
+    with pytest.raises(ValueError):
+        PeriodicJob("x:job", 1, 3)
@@ -0,0 +1,45 @@
+from beet import Context, Function, run_beet
+
+from mecha import Mecha
+
+from lepsen.core.plugin import compile_functions
+
+
+SOURCES = {
+    f"demo:f{n:02}": f"execute as @a\n    at @s\n    run say {n}\n"
+    for n in range(12)
+}
+SOURCES["demo:f03"] = "say 3\nnot_a_command\n"
+SOURCES["demo:f08"] = "tellraw @a {\n"
+
+
+def compile_with(workers):
+    result = {}
+
+    def plugin(ctx: Context):
+        for name, text in SOURCES.items():
+            ctx.data[name] = Function(text)
+        compile_functions(ctx, list(SOURCES), workers=workers)
+        mecha = ctx.inject(Mecha)
+        result["functions"] = {
+            name: function.text for name, function in ctx.data.functions.items()
+        }
+        result["diagnostics"] = [
+            (diagnostic.level, diagnostic.message, diagnostic.file, diagnostic.location)
+            for diagnostic in mecha.diagnostics.exceptions
+        ]
+        mecha.log_reported_diagnostics()
+        mecha.diagnostics.exceptions.clear()
+
+    with run_beet({}) as ctx:
+        plugin(ctx)
+    return result
+
+
+def test_parallel_compilation_matches_serial():
+    serial = compile_with(1)
+    parallel = compile_with(3)
+    assert parallel["functions"] == serial["functions"]
+    assert serial["functions"]["demo:f00"] == "execute as @a at @s run say 0\n"
+    assert len(serial["diagnostics"]) == 2
+    assert parallel["diagnostics"] == serial["diagnostics"]
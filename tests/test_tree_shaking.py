@@ -0,0 +1,77 @@
+from beet import Advancement, DataPack, Function, FunctionTag, ItemModifier, LootTable
+
+from lepsen.core import prune_unreachable
+
+
+PRIVATE = "x:_private/"
+
+
+def test_unreferenced_private_resources_are_removed():
+    pack = DataPack()
+    pack["x:main"] = Function([f"function {PRIVATE}used"])
+    pack[f"{PRIVATE}used"] = Function([f"function {PRIVATE}chain"])
+    pack[f"{PRIVATE}chain"] = Function(["say chain"])
+    pack[f"{PRIVATE}dead"] = Function([f"function {PRIVATE}dead_chain"])
+    pack[f"{PRIVATE}dead_chain"] = Function(["say dead"])
+    pack.function_tags[f"{PRIVATE}dead"] = FunctionTag({"values": [f"{PRIVATE}used"]})
+    pack[f"{PRIVATE}dead"] = LootTable({})
+    assert sorted(prune_unreachable(pack, PRIVATE)) == [
+        f"#{PRIVATE}dead",
+        f"loot_table:{PRIVATE}dead",
+        f"{PRIVATE}dead",
+        f"{PRIVATE}dead_chain",
+    ]
+    assert sorted(pack.functions) == [f"{PRIVATE}chain", f"{PRIVATE}used", "x:main"]
+
+
+def test_minecraft_tags_are_roots():
+    pack = DataPack()
+    pack.function_tags["minecraft:tick"] = FunctionTag({"values": [f"{PRIVATE}tick"]})
+    pack[f"{PRIVATE}tick"] = Function(["say tick"])
+    assert prune_unreachable(pack, PRIVATE) == []
+
+
+def test_advancement_reward_is_kept():
+    pack = DataPack()
+    pack["x:reward"] = Advancement({
+        "criteria": {"tick": {"trigger": "minecraft:tick"}},
+        "rewards": {"function": f"{PRIVATE}reward"},
+    })
+    pack[f"{PRIVATE}reward"] = Function(["say reward"])
+    assert prune_unreachable(pack, PRIVATE) == []
+    assert f"{PRIVATE}reward" in pack.functions
+
+
+def test_loot_table_used_by_item_modifier_is_kept():
+    pack = DataPack()
+    pack["x:contents"] = ItemModifier({
+        "function": "minecraft:set_contents",
+        "type": "minecraft:shulker_box",
+        "entries": [{"type": "minecraft:loot_table", "name": f"{PRIVATE}contents"}],
+    })
+    pack[f"{PRIVATE}contents"] = LootTable({})
+    assert prune_unreachable(pack, PRIVATE) == []
+
+
+def test_function_tag_references_are_followed():
+    pack = DataPack()
+    pack.function_tags["minecraft:load"] = FunctionTag({
+        "values": [{"id": f"#{PRIVATE}load", "required": False}],
+    })
+    pack.function_tags[f"{PRIVATE}load"] = FunctionTag({"values": [f"{PRIVATE}load"]})
+    pack[f"{PRIVATE}load"] = Function(["say load"])
+    assert prune_unreachable(pack, PRIVATE) == []
+
+
+def test_unscanned_resources_are_not_read():
+    pack = DataPack()
+    pack["x:user"] = Function([f"function {PRIVATE}only_from_user"])
+    pack[f"{PRIVATE}only_from_user"] = Function(["say user"])
+    pack.function_tags["x:user"] = FunctionTag({"values": [f"{PRIVATE}from_tag"]})
+    pack[f"{PRIVATE}from_tag"] = Function(["say tag"])
+    removed = prune_unreachable(
+        pack,
+        PRIVATE,
+        unscanned={(Function, "x:user"), (FunctionTag, "x:user")},
+    )
+    assert removed == [f"{PRIVATE}only_from_user"]